@@ -0,0 +1,81 @@
+# app/attendance_history.py
+
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.models import ClassSession, Attendance
+
+HISTORY_PAGE_SIZE = 25
+
+
+def fetch_attendance_history(
+    db: Session,
+    user_id: int,
+    before_ts: str = None,
+    before_id: int = None,
+    lecturer_id: int = None,
+):
+    """Returns one page of a student's attendance, newest first.
+
+    Uses keyset pagination on (timestamp, id): the next page starts after
+    the last row of this one, so deep pages cost the same as the first and
+    the (user_id, timestamp) index does the work. Session details come from
+    a single JOIN rather than one query per row.
+
+    Pass `lecturer_id` to only include that lecturer's sessions.
+    Returns (records, next_cursor) where next_cursor is None on the last page.
+    """
+    query = db.query(Attendance, ClassSession).join(
+        ClassSession, Attendance.session_id == ClassSession.id
+    ).filter(
+        Attendance.user_id == user_id
+    )
+
+    if lecturer_id is not None:
+        query = query.filter(ClassSession.user_id == lecturer_id)
+
+    # Continue strictly after the last row of the previous page
+    # (a malformed cursor just falls back to the first page)
+    cursor_ts = None
+    if before_ts and before_id is not None:
+        try:
+            cursor_ts = datetime.fromisoformat(before_ts)
+        except ValueError:
+            cursor_ts = None
+
+    if cursor_ts is not None:
+        query = query.filter(or_(
+            Attendance.timestamp < cursor_ts,
+            and_(Attendance.timestamp == cursor_ts, Attendance.id < before_id),
+        ))
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(
+        Attendance.timestamp.desc(), Attendance.id.desc()
+    ).limit(HISTORY_PAGE_SIZE + 1).all()
+
+    has_more = len(rows) > HISTORY_PAGE_SIZE
+    rows = rows[:HISTORY_PAGE_SIZE]
+
+    records = [
+        {
+            "course_code": session.course_code,
+            "course_title": session.course_title,
+            "session_id": session.id,
+            "timestamp": attendance.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+            "is_manual": attendance.is_manual,
+        }
+        for attendance, session in rows
+    ]
+
+    next_cursor = None
+    if has_more:
+        last_attendance = rows[-1][0]
+        next_cursor = {
+            "before_ts": last_attendance.timestamp.isoformat(),
+            "before_id": last_attendance.id,
+        }
+
+    return records, next_cursor
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from passlib.context import CryptContext
 from app.db import SessionLocal
 from app.models import User
+from app.dependencies import start_session, end_session, invalidate_user
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -85,6 +86,10 @@ async def login(
             "error": "❌ Invalid Staff Number or Password"
         })
 
+    # Start a fresh session (and re-read the profile on next request)
+    invalidate_user(user.id)
+    request.session.clear()
+    start_session(request, user)
     request.session["user_id"] = user.id
     request.session["user_role"] = user.role
     request.session["user_name"] = user.name
@@ -96,7 +101,7 @@ async def login(
 
 @router.get("/logout")
 async def logout(request: Request):
-    request.session.clear()
+    end_session(request)
     return RedirectResponse("/", status_code=status.HTTP_302_FOUND)
 
 @router.get("/register", response_class=HTMLResponse)
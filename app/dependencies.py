@@ -1,10 +1,42 @@
 # app/dependencies.py
 
+import secrets
+import threading
+import time
+from typing import NamedTuple, Optional
+
 from fastapi import Request, HTTPException, status, Depends
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from app.db import SessionLocal
 from app.models import User
+from app.shared_state import get_shared_state
+
+# Server-side session lifetime (seconds); the cookie alone can't be revoked
+SESSION_TTL = 8 * 60 * 60
+# How long a user row is served from the shared cache before re-reading the DB
+USER_CACHE_TTL = 5 * 60
+# Each worker also keeps recently used users in memory for a short while;
+# invalidations reach it over pub/sub, this just bounds staleness
+LOCAL_USER_CACHE_TTL = 30
+USER_CACHE_CHANNEL = "user-invalidated"
+
+class CachedUser(NamedTuple):
+    """Read-only snapshot of a User row (no password, not bound to a session)."""
+    id: int
+    name: Optional[str]
+    staff_no: Optional[str]
+    role: Optional[str]
+    college: Optional[str]
+    department: Optional[str]
+    level: Optional[str]
+
+_local_users = {}
+_local_users_lock = threading.Lock()
+# Bumped on every local invalidation, so a lookup that raced one knows not
+# to store what it read
+_local_users_epoch = 0
+_subscribed = False
 
 # Helper to get DB session (needed for dependency function)
 def get_db():
@@ -14,14 +46,110 @@ def get_db():
     finally:
         db.close()
 
+# --- Server-side sessions (shared by all workers) ---
+def start_session(request: Request, user: User):
+    """Registers a new server-side session and stores its ID in the cookie."""
+    session_id = secrets.token_urlsafe(32)
+    get_shared_state().set(f"session:{session_id}", user.id, ttl=SESSION_TTL)
+    request.session["session_id"] = session_id
+
+def end_session(request: Request):
+    """Revokes the server-side session so the cookie stops working everywhere."""
+    session_id = request.session.get("session_id")
+    if session_id:
+        get_shared_state().delete(f"session:{session_id}")
+    user_id = request.session.get("user_id")
+    if user_id:
+        invalidate_user(user_id)
+    request.session.clear()
+
+def is_session_valid(request: Request):
+    """True if the cookie's session ID is still live for its user_id."""
+    session_id = request.session.get("session_id")
+    if not session_id:
+        return False
+    return get_shared_state().get(f"session:{session_id}") == request.session.get("user_id")
+
+# --- Shared user cache ---
+def _on_user_invalidated(user_id):
+    # "*" means every user (e.g. after the tables were reset)
+    global _local_users_epoch
+    with _local_users_lock:
+        _local_users_epoch += 1
+        if user_id == "*":
+            _local_users.clear()
+        else:
+            _local_users.pop(user_id, None)
+
+def _ensure_subscribed():
+    global _subscribed
+    with _local_users_lock:
+        if _subscribed:
+            return
+        _subscribed = True
+    get_shared_state().subscribe(USER_CACHE_CHANNEL, _on_user_invalidated)
+
+def get_cached_user(db: Session, user_id: int):
+    """Returns a CachedUser for user_id, or None if the user doesn't exist.
+
+    Looks in this worker's memory, then the shared store, then the database.
+    Always returns a CachedUser, never an ORM row, so query the database
+    directly if you need to modify the user.
+    """
+    _ensure_subscribed()
+
+    with _local_users_lock:
+        entry = _local_users.get(user_id)
+        epoch = _local_users_epoch
+    if entry and entry[1] > time.time():
+        return entry[0]
+
+    # Shared entries are tagged with the user's generation at the time the
+    # row was read; invalidate_user bumps it, so an entry written back from
+    # a read that raced an invalidation is ignored rather than served
+    state = get_shared_state()
+    generation = state.get(f"user-gen:{user_id}", 0)
+    data = state.get(f"user:{user_id}")
+    if data is not None and data["gen"] == generation:
+        user = CachedUser(*data["fields"])
+    else:
+        row = db.query(User).filter(User.id == user_id).first()
+        if not row:
+            return None
+        user = CachedUser(*(getattr(row, field) for field in CachedUser._fields))
+        state.set(f"user:{user_id}", {"gen": generation, "fields": list(user)}, ttl=USER_CACHE_TTL)
+
+    with _local_users_lock:
+        if _local_users_epoch == epoch:
+            _local_users[user_id] = (user, time.time() + LOCAL_USER_CACHE_TTL)
+    return user
+
+def invalidate_user(user_id: int):
+    """Drops a user from the shared cache and from every worker's memory.
+
+    This worker forgets the user immediately; other workers do so when
+    their poller picks up the message (within POLL_INTERVAL).
+    """
+    state = get_shared_state()
+    state.incr(f"user-gen:{user_id}")
+    state.delete(f"user:{user_id}")
+    _on_user_invalidated(user_id)
+    state.publish(USER_CACHE_CHANNEL, user_id)
+
+def reset_shared_state():
+    """Forgets all sessions and cached users (call after the tables are reset)."""
+    get_shared_state().clear()
+    get_shared_state().publish(USER_CACHE_CHANNEL, "*")
+
 def get_current_user(request: Request, db: Session = Depends(get_db)):
     """Fetches the user object from the session ID, or redirects to login."""
     
     # 1. Get user_id from session
     user_id = request.session.get('user_id')
     
-    # 2. Check for missing session data
-    if not user_id:
+    # 2. Check for missing or revoked session data
+    if not user_id or not is_session_valid(request):
+        request.session.clear()
         # Redirect to login page
         raise HTTPException(
             status_code=status.HTTP_303_SEE_OTHER,
@@ -29,8 +157,8 @@ def get_current_user(request: Request, db: Session = Depends(get_db)):
             headers={"Location": "/"}
         )
         
-    # 3. Fetch user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    # 3. Fetch user (shared cache first, then database)
+    user = get_cached_user(db, user_id)
     
     # 4. Check for deleted/invalid user
     if not user:
@@ -1,6 +1,7 @@
 import csv
 import io
 from datetime import datetime
+from urllib.parse import quote
 
 from fastapi import APIRouter, Request, Form, Depends, status
 from fastapi.responses import RedirectResponse, StreamingResponse
@@ -9,7 +10,8 @@ from sqlalchemy.orm import Session
 
 from app.db import SessionLocal
 from app.models import User, ClassSession, Attendance 
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, CachedUser
+from app.attendance_history import fetch_attendance_history
 
 router = APIRouter(prefix="/lecturer", tags=["lecturer"])
 templates = Jinja2Templates(directory="app/templates")
@@ -26,7 +28,7 @@ def get_db():
 async def lecturer_dashboard(
     request: Request, 
     db: Session = Depends(get_db),
-    lecturer: User = Depends(get_current_user)
+    lecturer: CachedUser = Depends(get_current_user)
 ):
     if lecturer.role != "lecturer":
         return RedirectResponse("/student/dashboard", status_code=status.HTTP_302_FOUND)
@@ -52,7 +54,7 @@ async def create_session(
     longitude: float = Form(...),
     radius_meters: float = Form(...),
     db: Session = Depends(get_db),
-    lecturer: User = Depends(get_current_user)
+    lecturer: CachedUser = Depends(get_current_user)
 ):
     if lecturer.role != "lecturer":
         return RedirectResponse("/student/dashboard", status_code=status.HTTP_302_FOUND)
@@ -80,7 +82,7 @@ async def create_session(
 async def close_session(
     session_id: int, 
     db: Session = Depends(get_db),
-    lecturer: User = Depends(get_current_user)
+    lecturer: CachedUser = Depends(get_current_user)
 ):
     if lecturer.role != "lecturer":
         return RedirectResponse("/student/dashboard", status_code=status.HTTP_302_FOUND)
@@ -102,7 +104,7 @@ async def view_report(
     session_id: int,
     request: Request,
     db: Session = Depends(get_db),
-    lecturer: User = Depends(get_current_user)
+    lecturer: CachedUser = Depends(get_current_user)
 ):
     if lecturer.role != "lecturer":
         return RedirectResponse("/student/dashboard", status_code=status.HTTP_302_FOUND)
@@ -147,7 +149,7 @@ async def view_report(
 async def export_report(
     session_id: int,
     db: Session = Depends(get_db),
-    lecturer: User = Depends(get_current_user)
+    lecturer: CachedUser = Depends(get_current_user)
 ):
     if lecturer.role != "lecturer":
         return RedirectResponse("/student/dashboard", status_code=status.HTTP_302_FOUND)
@@ -190,4 +192,50 @@ async def export_report(
     filename = f"Attendance_{session.course_code}_{session.id}.csv"
     response.headers["Content-Disposition"] = f"attachment; filename={filename}"
     
-    return response
\ No newline at end of file
+    return response
+
+
+# --- 6. Student Attendance Lookup (GET) ---
+@router.get("/student-history")
+async def student_history_lookup(
+    request: Request,
+    staff_no: str = None,
+    before_ts: str = None,
+    before_id: int = None,
+    db: Session = Depends(get_db),
+    lecturer: CachedUser = Depends(get_current_user)
+):
+    if lecturer.role != "lecturer":
+        return RedirectResponse("/student/dashboard", status_code=status.HTTP_302_FOUND)
+
+    context = {
+        "request": request,
+        "lecturer": lecturer,
+        "staff_no": staff_no,
+        "student": None,
+        "records": [],
+        "next_cursor": None,
+        "back_url": "/lecturer/dashboard"
+    }
+
+    if staff_no:
+        student = db.query(User).filter(
+            User.staff_no == staff_no,
+            User.role == "student"
+        ).first()
+
+        if not student:
+            context["error"] = f"No student found with Matric No {staff_no}"
+        else:
+            # Lecturers only see check-ins for their own sessions
+            records, next_cursor = fetch_attendance_history(
+                db, student.id, before_ts, before_id, lecturer_id=lecturer.id
+            )
+            context.update({
+                "student": student,
+                "records": records,
+                "next_cursor": next_cursor,
+                "history_url": f"/lecturer/student-history?staff_no={quote(staff_no)}"
+            })
+
+    return templates.TemplateResponse("attendance_history.html", context)
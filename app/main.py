@@ -13,6 +13,7 @@ from app.models import User, ClassSession, Attendance
 from app.auth_router import router as auth_router
 from app.lecturer_router import router as lecturer_router
 from app.student_router import router as student_router
+from app.dependencies import is_session_valid, reset_shared_state
 
 middleware = [
     Middleware(SessionMiddleware, secret_key="YOUR_VERY_STRONG_SECRET_KEY_HERE_2025")
@@ -23,6 +24,8 @@ app = FastAPI(middleware=middleware)
 # We use this ONLY ONCE to force-fix the database structure.
 Base.metadata.drop_all(bind=engine)
 Base.metadata.create_all(bind=engine)
+# Sessions and cached users in the shared store point at the old rows
+reset_shared_state()
 templates = Jinja2Templates(directory="app/templates")
 
 app.include_router(auth_router)
@@ -41,7 +44,7 @@ def get_db():
 
 @app.get("/", response_class=HTMLResponse)
 async def login_page(request: Request):
-    if request.session.get('user_id'):
+    if request.session.get('user_id') and is_session_valid(request):
         role = request.session.get('user_role')
         if role == 'lecturer':
             return RedirectResponse("/lecturer/dashboard", status_code=302)
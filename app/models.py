@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db import Base
 
@@ -37,4 +37,9 @@ class Attendance(Base):
     timestamp = Column(DateTime)
     ip_address = Column(String, nullable=True)
     device_info = Column(String, nullable=True)
-    is_manual = Column(Boolean, default=False)
\ No newline at end of file
+    is_manual = Column(Boolean, default=False)
+
+    # Serves per-student history pages: WHERE user_id = ? ORDER BY timestamp
+    __table_args__ = (
+        Index("ix_attendance_user_id_timestamp", "user_id", "timestamp"),
+    )
\ No newline at end of file
@@ -0,0 +1,348 @@
+# app/shared_state.py
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+
+# ==========================================
+# ⚙️ CONFIGURATION
+# ==========================================
+# "memory" -> one dict per process (fine for `uvicorn` with a single worker)
+# "shm"    -> SQLite file in shared memory, visible to every gunicorn worker
+SHARED_STATE_BACKEND = os.getenv("SHARED_STATE_BACKEND", "shm")
+
+# /dev/shm is RAM-backed on Linux (Render); fall back to the temp dir elsewhere
+_default_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+SHARED_STATE_PATH = os.getenv(
+    "SHARED_STATE_PATH", os.path.join(_default_dir, "attendance_shared_state.db")
+)
+
+# How often workers look for messages published by other workers (seconds)
+POLL_INTERVAL = 0.5
+# How long published messages are kept before being pruned (seconds)
+EVENT_RETENTION = 60
+# Expired keys and old messages are swept out once every this many writes
+SWEEP_EVERY = 100
+
+logger = logging.getLogger(__name__)
+
+
+def _dispatch(channel, callbacks, message):
+    # One broken subscriber must not stop delivery to the others (or kill
+    # the poller thread, which would silently end pub/sub for this worker)
+    for callback in callbacks:
+        try:
+            callback(message)
+        except Exception:
+            logger.exception("Subscriber for %r failed on message %r", channel, message)
+
+
+class SharedState(ABC):
+    """Key/value store with TTLs, pub/sub invalidation and atomic counters.
+
+    Values must be JSON-serialisable so every backend stores the same thing.
+    """
+
+    @abstractmethod
+    def get(self, key, default=None):
+        pass
+
+    @abstractmethod
+    def set(self, key, value, ttl=None):
+        pass
+
+    @abstractmethod
+    def delete(self, key):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        """Drops every key and pending message (e.g. after a schema reset)."""
+
+    @abstractmethod
+    def incr(self, key, amount=1, ttl=None):
+        """Atomically add `amount` to a counter and return the new value.
+
+        `ttl` only applies when the counter is created, so it behaves like a
+        fixed window for rate limiting.
+        """
+
+    @abstractmethod
+    def publish(self, channel, message):
+        pass
+
+    @abstractmethod
+    def subscribe(self, channel, callback):
+        """Call `callback(message)` for every message published on `channel`."""
+
+
+# ==========================================
+# 🧠 IN-PROCESS BACKEND
+# ==========================================
+class InProcessState(SharedState):
+    def __init__(self):
+        self._data = {}
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _live_value(self, key):
+        # Caller must hold the lock
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._live_value(key)
+        if entry is None:
+            return default
+        return json.loads(entry[0])
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (json.dumps(value), expires_at)
+            self._count_write()
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _count_write(self):
+        # Caller must hold the lock
+        self._writes += 1
+        if self._writes % SWEEP_EVERY == 0:
+            now = time.time()
+            expired = [
+                key for key, (_, expires_at) in self._data.items()
+                if expires_at is not None and expires_at <= now
+            ]
+            for key in expired:
+                del self._data[key]
+
+    def incr(self, key, amount=1, ttl=None):
+        with self._lock:
+            entry = self._live_value(key)
+            if entry is None:
+                new_value = amount
+                expires_at = time.time() + ttl if ttl else None
+            else:
+                new_value = json.loads(entry[0]) + amount
+                expires_at = entry[1]
+            self._data[key] = (json.dumps(new_value), expires_at)
+            self._count_write()
+        return new_value
+
+    def publish(self, channel, message):
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, []))
+        _dispatch(channel, callbacks, message)
+
+    def subscribe(self, channel, callback):
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+
+
+# ==========================================
+# 🔀 MULTI-PROCESS BACKEND (SQLite in /dev/shm)
+# ==========================================
+class SharedMemoryState(SharedState):
+    """Shares state between gunicorn workers through one SQLite file.
+
+    Every worker opens the same file, so a value set (or deleted) by one
+    worker is seen by all of them. Published messages go into an `events`
+    table that a background thread in each worker polls.
+    """
+
+    def __init__(self, path=SHARED_STATE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._poller = None
+        self._last_event_id = 0
+        self._writes = 0
+
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " channel TEXT NOT NULL, message TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def _conn(self):
+        # sqlite3 connections can't be shared between threads, so keep one each
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time()),
+        ).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        self._conn().execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), expires_at),
+        )
+        self._count_write()
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM kv")
+            conn.execute("DELETE FROM events")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _count_write(self):
+        # Expired rows are skipped on read, but would pile up in RAM if
+        # nothing removed them (e.g. sessions that never log out)
+        with self._lock:
+            self._writes += 1
+            due = self._writes % SWEEP_EVERY == 0
+        if due:
+            self.sweep()
+
+    def sweep(self):
+        """Deletes expired keys and messages older than EVENT_RETENTION."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            conn.execute("DELETE FROM events WHERE created_at < ?", (now - EVENT_RETENTION,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def incr(self, key, amount=1, ttl=None):
+        conn = self._conn()
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock up front, so no other worker
+        # can read the old value between our SELECT and UPDATE.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                new_value = amount
+                expires_at = now + ttl if ttl else None
+            else:
+                new_value = json.loads(row[0]) + amount
+                expires_at = row[1]
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(new_value), expires_at),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._count_write()
+        return new_value
+
+    def publish(self, channel, message):
+        # A single INSERT autocommits; old messages are pruned by sweep()
+        self._conn().execute(
+            "INSERT INTO events (channel, message, created_at) VALUES (?, ?, ?)",
+            (channel, json.dumps(message), time.time()),
+        )
+        self._count_write()
+
+    def subscribe(self, channel, callback):
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+            if self._poller is None:
+                # Only deliver messages published after the first subscription
+                row = self._conn().execute("SELECT MAX(id) FROM events").fetchone()
+                self._last_event_id = row[0] or 0
+                self._poller = threading.Thread(target=self._poll_forever, daemon=True)
+                self._poller.start()
+
+    def poll(self):
+        """Deliver any messages published since the last poll."""
+        rows = self._conn().execute(
+            "SELECT id, channel, message FROM events WHERE id > ? ORDER BY id",
+            (self._last_event_id,),
+        ).fetchall()
+        for event_id, channel, message in rows:
+            self._last_event_id = event_id
+            try:
+                message = json.loads(message)
+            except ValueError:
+                logger.exception("Skipping malformed message %r on %r", message, channel)
+                continue
+            with self._lock:
+                callbacks = list(self._subscribers.get(channel, []))
+            _dispatch(channel, callbacks, message)
+
+    def _poll_forever(self):
+        while True:
+            try:
+                self.poll()
+            except sqlite3.Error:
+                pass  # Database busy; try again on the next tick
+            except Exception:
+                logger.exception("Shared state poller failed; retrying")
+            time.sleep(POLL_INTERVAL)
+
+
+# ==========================================
+# 🏭 BACKEND SELECTION
+# ==========================================
+_state = None
+_state_lock = threading.Lock()
+
+
+def get_shared_state():
+    """Returns the process-wide SharedState for the configured backend."""
+    global _state
+    if _state is None:
+        with _state_lock:
+            if _state is None:
+                if SHARED_STATE_BACKEND == "memory":
+                    _state = InProcessState()
+                elif SHARED_STATE_BACKEND == "shm":
+                    _state = SharedMemoryState()
+                else:
+                    raise ValueError(f"Unknown SHARED_STATE_BACKEND: {SHARED_STATE_BACKEND!r}")
+    return _state
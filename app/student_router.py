@@ -5,7 +5,9 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 from haversine import haversine
 from app.db import SessionLocal  # <--- Changed this import!
-from app.models import User, ClassSession, Attendance
+from app.models import ClassSession, Attendance
+from app.dependencies import is_session_valid, get_cached_user
+from app.attendance_history import fetch_attendance_history
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -25,11 +27,11 @@ def get_db():
 async def student_dashboard(request: Request, db: Session = Depends(get_db)):
     # 1. Check Login
     user_id = request.session.get("user_id")
-    if not user_id or request.session.get("user_role") != "student":
+    if not user_id or request.session.get("user_role") != "student" or not is_session_valid(request):
         return RedirectResponse("/", status_code=status.HTTP_302_FOUND)
 
     # 2. Get Student (Ghost Cookie Protection)
-    student = db.query(User).filter(User.id == user_id).first()
+    student = get_cached_user(db, user_id)
     if not student:
         request.session.clear()
         return RedirectResponse("/", status_code=status.HTTP_302_FOUND)
@@ -40,7 +42,7 @@ async def student_dashboard(request: Request, db: Session = Depends(get_db)):
     # 4. Get Lecturer Name Safely (Separate Variable)
     lecturer_name = "Unknown Lecturer" 
     if active_session:
-        lecturer = db.query(User).filter(User.id == active_session.user_id).first()
+        lecturer = get_cached_user(db, active_session.user_id)
         if lecturer:
             lecturer_name = lecturer.name
 
@@ -52,6 +54,36 @@ async def student_dashboard(request: Request, db: Session = Depends(get_db)):
         "lecturer_name": lecturer_name   # ✅ Fixed: Sending Name separately
     })
 
+# ==========================================
+# 📜 ATTENDANCE HISTORY
+# ==========================================
+@router.get("/student/history", response_class=HTMLResponse)
+async def student_history(
+    request: Request,
+    before_ts: str = None,
+    before_id: int = None,
+    db: Session = Depends(get_db)
+):
+    user_id = request.session.get("user_id")
+    if not user_id or request.session.get("user_role") != "student" or not is_session_valid(request):
+        return RedirectResponse("/", status_code=status.HTTP_302_FOUND)
+
+    student = get_cached_user(db, user_id)
+    if not student:
+        request.session.clear()
+        return RedirectResponse("/", status_code=status.HTTP_302_FOUND)
+
+    records, next_cursor = fetch_attendance_history(db, student.id, before_ts, before_id)
+
+    return templates.TemplateResponse("attendance_history.html", {
+        "request": request,
+        "student": student,
+        "records": records,
+        "next_cursor": next_cursor,
+        "history_url": "/student/history",
+        "back_url": "/student/dashboard"
+    })
+
 # ==========================================
 # 🚀 CHECK-IN ROUTE
 # ==========================================
@@ -64,11 +96,11 @@ async def check_in(
     db: Session = Depends(get_db)
 ):
     user_id = request.session.get("user_id")
-    if not user_id:
+    if not user_id or not is_session_valid(request):
         return RedirectResponse("/", status_code=status.HTTP_302_FOUND)
 
     # A. Get User and Session
-    student = db.query(User).filter(User.id == user_id).first()
+    student = get_cached_user(db, user_id)
     session = db.query(ClassSession).filter(ClassSession.id == session_id).first()
 
     if not session or session.is_active == 0: